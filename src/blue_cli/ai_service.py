@@ -1,9 +1,14 @@
 #!/usr/bin/env python3
 # -*- coding: UTF-8 -*-
+import contextlib
 import re
+from array import array
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from enum import StrEnum
-from functools import cached_property
+from functools import cached_property, lru_cache
+from itertools import islice
 from textwrap import dedent
 from typing import Protocol
 
@@ -15,6 +20,12 @@ from .tidal_service import TidalService
 
 rprint = console.print
 
+_ARTIST_VARIANTS = (
+    lambda artist: artist.replace(".", ""),  # Remove periods
+    lambda artist: " ".join(artist.replace(".", " ").split()),  # Periods to spaces
+    lambda artist: artist.replace(" ", ""),  # Remove spaces
+)
+
 
 class ResponseType(StrEnum):
     """Types of AI responses."""
@@ -32,7 +43,7 @@ class Recommendation:
     album: str
 
 
-@dataclass(slots=True)
+@dataclass(slots=True, frozen=True)
 class SearchResult:
     """Result from searching for an album on Tidal."""
 
@@ -94,20 +105,58 @@ class SearchQuery:
         """Get album-only search query."""
         return self.album
 
-    def artist_variation_queries(self) -> list[str]:
-        """Get artist name variations for search."""
-        variations = [
-            self.artist.replace(".", ""),  # Remove periods
-            self.artist.replace(".", " "),  # Replace periods with spaces
-            self.artist.replace(" ", ""),  # Remove spaces
+    def prefetch_queries(self, variations: int = 2) -> list[str]:
+        """Get the queries the default strategies try first, in priority order."""
+        return [
+            self.basic_query,
+            self.album_only_query,
+            *islice(self.artist_variation_queries(), variations),
         ]
-        return [f"{variant} {self.album}" for variant in variations if variant != self.artist]
+
+    def artist_variation_queries(self) -> Iterator[str]:
+        """Yield artist name variations for search, each built only when it is tried."""
+        seen = {self.artist}
+        for make_variant in _ARTIST_VARIANTS:
+            variant = make_variant(self.artist)
+            if variant not in seen:
+                seen.add(variant)
+                yield f"{variant} {self.album}"
+
+
+class AlbumSearcher(Protocol):
+    """Anything that can search Tidal albums, the service itself or a cached front."""
+
+    def search_albums(self, album: str) -> list[dict]:
+        """Search albums matching the query."""
+        ...
+
+
+class CachedAlbumSearcher:
+    """Memoizes album searches per query in front of the Tidal service."""
+
+    def __init__(self, tidal_service: AlbumSearcher, maxsize: int = 1024):
+        self.search_albums = lru_cache(maxsize=maxsize)(tidal_service.search_albums)
+
+    def cache_clear(self) -> None:
+        """Forget all memoized searches."""
+        self.search_albums.cache_clear()
+
+
+@dataclass(slots=True)
+class RecommendationAlbumSearcher:
+    """Searches Tidal albums without rewriting the track preview's albums.json."""
+
+    tidal_service: TidalService
+
+    def search_albums(self, album: str) -> list[dict]:
+        # Recommendation searches run concurrently and never feed the track preview
+        return self.tidal_service.search_albums(album, write_album_cache=False)
 
 
 class SearchStrategy(Protocol):
     """Protocol for different search strategies."""
 
-    def search(self, search_query: SearchQuery, tidal_service: TidalService) -> list[dict]:
+    def search(self, search_query: SearchQuery, tidal_service: AlbumSearcher) -> list[dict]:
         """Execute search strategy and return albums."""
         ...
 
@@ -120,7 +169,7 @@ class SearchStrategy(Protocol):
 class BasicSearchStrategy:
     """Search using artist and album name together."""
 
-    def search(self, search_query: SearchQuery, tidal_service: TidalService) -> list[dict]:
+    def search(self, search_query: SearchQuery, tidal_service: AlbumSearcher) -> list[dict]:
         return tidal_service.search_albums(search_query.basic_query)
 
     def get_description(self, search_query: SearchQuery) -> str:
@@ -131,7 +180,7 @@ class BasicSearchStrategy:
 class AlbumOnlySearchStrategy:
     """Search using album name only."""
 
-    def search(self, search_query: SearchQuery, tidal_service: TidalService) -> list[dict]:
+    def search(self, search_query: SearchQuery, tidal_service: AlbumSearcher) -> list[dict]:
         print(f"No results for basic search, trying album name only: '{search_query.album}'")
         albums = tidal_service.search_albums(search_query.album_only_query)
         print(f"Album-only search results: {len(albums)} albums found")
@@ -145,7 +194,7 @@ class AlbumOnlySearchStrategy:
 class ArtistVariationSearchStrategy:
     """Search using different artist name variations."""
 
-    def search(self, search_query: SearchQuery, tidal_service: TidalService) -> list[dict]:
+    def search(self, search_query: SearchQuery, tidal_service: AlbumSearcher) -> list[dict]:
         for variant_query in search_query.artist_variation_queries():
             print(f"Trying artist variation: '{variant_query}'")
             albums = tidal_service.search_albums(variant_query)
@@ -169,7 +218,7 @@ class SearchStrategyManager:
         ]
     )
 
-    def find_albums(self, search_query: SearchQuery, tidal_service: TidalService) -> list[dict]:
+    def find_albums(self, search_query: SearchQuery, tidal_service: AlbumSearcher) -> list[dict]:
         """Try each strategy until albums are found."""
         for strategy in self.strategies:
             albums = strategy.search(search_query, tidal_service)
@@ -348,20 +397,78 @@ class RecommendationParser:
         return recommendations_list
 
 
+def _normalize_artist(name: str) -> str:
+    """Lowercase an artist name and drop periods and spaces."""
+    return name.lower().replace(".", "").replace(" ", "")
+
+
+def _bounded_levenshtein(a: str, b: str, max_dist: int) -> int:
+    """Edit distance between a and b, or max_dist + 1 once it is known to be larger.
+
+    Only the diagonal band of width max_dist is filled, and the scan stops as
+    soon as a whole row exceeds max_dist.
+    """
+    too_far = max_dist + 1
+    if abs(len(a) - len(b)) > max_dist:
+        return too_far
+
+    previous = array("i", range(len(b) + 1))
+    current = array("i", [0]) * (len(b) + 1)
+    for i, char_a in enumerate(a, 1):
+        lo = max(1, i - max_dist)
+        hi = min(len(b), i + max_dist)
+        current[lo - 1] = i if lo == 1 else too_far
+        for j in range(lo, hi + 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != b[j - 1]),
+            )
+        if hi < len(b):
+            current[hi + 1] = too_far
+        if min(current[lo - 1 : hi + 1]) > max_dist:
+            return too_far
+        previous, current = current, previous
+
+    return min(previous[len(b)], too_far)
+
+
 class AlbumSearchService:
     """Handles album search operations on Tidal."""
 
     def __init__(
-        self, tidal_service: TidalService, strategy_manager: SearchStrategyManager | None = None
+        self,
+        tidal_service: TidalService,
+        strategy_manager: SearchStrategyManager | None = None,
+        parallel: bool = False,
+        album_searcher: AlbumSearcher | None = None,
     ):
         self.tidal_service = tidal_service
         self.strategy_manager = strategy_manager or SearchStrategyManager()
+        self.parallel = parallel
+        # Recommendations often share strategy queries, e.g. the album-only search
+        self._searcher = CachedAlbumSearcher(album_searcher or tidal_service)
+        # AI lists repeat recommendations, including ones Tidal does not have (None)
+        self._match_cache: dict[Recommendation, SearchResult | None] = {}
+
+    def clear_cache(self) -> None:
+        """Forget memoized album searches, e.g. after the Tidal catalog changed."""
+        self._searcher.cache_clear()
+        self._match_cache.clear()
 
     def find_best_match(self, recommendation: Recommendation) -> SearchResult | None:
         """Find the best matching album on Tidal using multiple search strategies."""
+        if recommendation not in self._match_cache:
+            self._match_cache[recommendation] = self._search_best_match(recommendation)
+        return self._match_cache[recommendation]
+
+    def _search_best_match(self, recommendation: Recommendation) -> SearchResult | None:
+        """Run the search strategies and pick the best album for a recommendation."""
         try:
             search_query = SearchQuery(recommendation.artist, recommendation.album)
-            albums = self.strategy_manager.find_albums(search_query, self.tidal_service)
+            if self.parallel:
+                self._prefetch(search_query.prefetch_queries())
+            albums = self.strategy_manager.find_albums(search_query, self._searcher)
 
             if not albums:
                 return None
@@ -374,6 +481,18 @@ class AlbumSearchService:
                 f"Error searching for {recommendation.artist} - {recommendation.album}: {str(e)}"
             ) from e
 
+    def _prefetch(self, queries: list[str]) -> None:
+        """Run the likely strategy searches concurrently to warm the search cache."""
+
+        def prefetch(query: str) -> None:
+            # Best effort, failures are not cached and the strategy that needs the query retries it
+            with contextlib.suppress(Exception):
+                self._searcher.search_albums(query)
+
+        # Strategies still run in priority order afterwards, served from the cache
+        with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+            list(executor.map(prefetch, queries))
+
     def _select_best_match(self, albums: list[dict], target_artist: str) -> dict:
         """Select the best matching album from search results."""
         best_album = self._find_best_artist_match(albums, target_artist)
@@ -393,26 +512,40 @@ class AlbumSearchService:
     def _find_best_artist_match(self, albums: list, target_artist: str) -> dict | None:
         """Find the album with the best artist name match using guard clauses."""
         target_lower = target_artist.lower()
+        # First album per lowercased and per normalized artist name, in result order
+        by_lower: dict[str, dict] = {}
+        by_normalized: dict[str, dict] = {}
+        for album in albums:
+            album_artist_lower = album["artist"].lower()
+            by_lower.setdefault(album_artist_lower, album)
+            by_normalized.setdefault(_normalize_artist(album_artist_lower), album)
 
         # Guard clause: exact matches (case insensitive)
-        for album in albums:
-            if album["artist"].lower() == target_lower:
-                return album
+        if target_lower in by_lower:
+            return by_lower[target_lower]
 
         # Guard clause: partial matches
-        for album in albums:
-            album_artist_lower = album["artist"].lower()
+        for album_artist_lower, album in by_lower.items():
             if target_lower in album_artist_lower or album_artist_lower in target_lower:
                 return album
 
         # Guard clause: normalized versions (remove periods, spaces)
-        target_normalized = target_lower.replace(".", "").replace(" ", "")
-        for album in albums:
-            album_normalized = album["artist"].lower().replace(".", "").replace(" ", "")
-            if target_normalized == album_normalized:
-                return album
-
-        return None
+        target_normalized = _normalize_artist(target_lower)
+        if target_normalized in by_normalized:
+            return by_normalized[target_normalized]
+
+        # Fallback: the closest normalized name within a typo budget of a quarter of its length
+        best_album = None
+        best_dist = max(1, len(target_normalized) // 4) + 1
+        target_length = len(target_normalized)
+        for album_normalized, album in by_normalized.items():
+            # The length difference alone is a lower bound on the edit distance
+            if abs(len(album_normalized) - target_length) >= best_dist:
+                continue
+            dist = _bounded_levenshtein(target_normalized, album_normalized, best_dist - 1)
+            if dist < best_dist:
+                best_album, best_dist = album, dist
+        return best_album
 
     def add_to_queue(self, search_result: SearchResult) -> bool:
         """Add search result to Tidal queue."""
@@ -540,7 +673,11 @@ class AIRecommendationService:
         self.port = port or get_port()
         self.tidal_service = TidalService(host=self.host, port=self.port)
         self.ai_client = AIClient(model=model, verbose=verbose)
-        self.search_service = AlbumSearchService(self.tidal_service)
+        self.search_service = AlbumSearchService(
+            self.tidal_service,
+            parallel=True,
+            album_searcher=RecommendationAlbumSearcher(self.tidal_service),
+        )
         self.explanation_service = ExplanationService(self.ai_client)
         self.parser = RecommendationParser()
         self.display_service = RecommendationDisplayService()
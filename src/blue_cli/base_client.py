@@ -2,20 +2,30 @@
 # -*- coding: UTF-8 -*-
 import time
 from dataclasses import dataclass
+from io import BytesIO
+from xml.etree.ElementTree import Element, iterparse
 
-import jmespath
 import xmltodict
 from click import ClickException
 from pyfzf.pyfzf import FzfPrompt
-from requests import get, post
+from requests import Session
+from requests.adapters import HTTPAdapter
 from requests.exceptions import ConnectionError
 from rich.progress import Progress
 
+from .config import HTTP_WORKERS
 from .console import console
 from .playlist_service import PlaylistService
 
 rprint = console.print
 
+REMOVE_ALBUM_FZF = FzfPrompt("fzf --tmux 90%,80% --prompt='Select album to remove> '")
+
+# Shared by every client so the player connection is kept alive between requests; module
+# level keeps it out of the pickled instance that diskcache uses as part of its keys
+_session = Session()
+_session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_WORKERS))
+
 
 @dataclass
 class Song:
@@ -30,6 +40,22 @@ class Song:
         return f"{self.song_id}: {self.artist} - {self.album} - {self.title}"
 
 
+def _record_field(elem: Element, name: str) -> str | None:
+    """Read a field from an attribute or child element, "#text" for the element text
+
+    Values match xmltodict: element text is stripped and empty text is None.
+    """
+    if name != "#text":
+        value = elem.get(name)
+        if value is not None:
+            return value
+        child = elem.find(name)
+        if child is None:
+            return None
+        elem = child
+    return (elem.text or "").strip() or None
+
+
 def format_time(seconds: int) -> str:
     """Format seconds as M:SS or MM:SS time string"""
     minutes, secs = divmod(seconds, 60)
@@ -54,7 +80,7 @@ class BluesoundBaseClient:
         if endpoint.startswith("/"):
             endpoint = endpoint[1:]
         url = f"{self.url}/{endpoint}"
-        request_func = get if method.upper() == "GET" else post
+        request_func = _session.get if method.upper() == "GET" else _session.post
         try:
             r = request_func(url, params=params, json=json)
         except ConnectionError as err:
@@ -74,6 +100,36 @@ class BluesoundBaseClient:
             raise ClickException("Output parsing error")
         return obj
 
+    def _parse_records(
+        self, response, container: str, tag: str, fields: dict[str, str]
+    ) -> tuple[list[dict], str | None]:
+        """Stream `tag` children of a `container` response into flat dicts.
+
+        `fields` maps output keys to XML attribute or child element names.
+        Returns the records and the container's nextlink. An error response
+        (or any other root element) yields no records.
+        """
+        xml_bytes = response.content if hasattr(response, "content") else response.encode()
+        context = iterparse(BytesIO(xml_bytes), events=("start", "end"))
+        _, root = next(context)
+        if root.tag != container:
+            return [], None
+
+        records = []
+        depth = 1
+        for event, elem in context:
+            if event == "start":
+                depth += 1
+                continue
+            depth -= 1
+            # Only direct children are records, nested elements are read via findtext
+            if depth == 1 and elem.tag == tag:
+                records.append({key: _record_field(elem, name) for key, name in fields.items()})
+                elem.clear()
+
+        nextlink = _record_field(root, "nextlink")
+        return records, nextlink or None
+
     def pause(self) -> None:
         self._make_request("Pause", params={"toggle": 1})
 
@@ -86,7 +142,7 @@ class BluesoundBaseClient:
     def volume(self, new_volume: int | None):
         r = self._make_request("Status")
         obj = self._parse_xml(r)
-        current_volume = jmespath.search("status.volume", obj)
+        current_volume = obj.get("status", {}).get("volume")
         if not isinstance(current_volume, str):
             raise TypeError
         current_volume = int(current_volume)
@@ -114,10 +170,10 @@ class BluesoundBaseClient:
         s = console.status("Getin queue...")
         s.start()
         status = self.curent_song_id()
-        albums = self.playlist_service.get_album_blocks()
+        playlist = self.playlist_service.get_playlist()
+        albums = playlist.get_contiguous_album_blocks()
 
         # Get current song to retrieve album_id for matching
-        playlist = self.playlist_service.get_playlist()
         current_song = playlist.find_song_by_id(status.song_id)
         current_album = 1
         s.stop()
@@ -161,17 +217,17 @@ class BluesoundBaseClient:
     def curent_song_id(self) -> Song:
         r = self._make_request("Status")
         obj = self._parse_xml(r)
-        s = jmespath.search("status.[song, album, artist, name, secs, totlen]", obj)
-        if not isinstance(s, list):
+        status = obj.get("status")
+        if not isinstance(status, dict):
             raise TypeError
         # Extract optional time fields, converting to int if present
-        secs = int(s[4]) if s[4] is not None else None
-        totlen = int(s[5]) if s[5] is not None else None
+        secs = int(status["secs"]) if status.get("secs") is not None else None
+        totlen = int(status["totlen"]) if status.get("totlen") is not None else None
         song = Song(
-            artist=s[2],
-            title=s[3],
-            album=s[1],
-            song_id=int(s[0]),
+            artist=status.get("artist"),
+            title=status.get("name"),
+            album=status.get("album"),
+            song_id=int(status["song"]),
             secs=secs,
             totlen=totlen,
         )  # type: ignore
@@ -238,8 +294,7 @@ class BluesoundBaseClient:
             album_id_map[display_text] = album_id
 
         try:
-            fzf = FzfPrompt("fzf --tmux 90%,80% --prompt='Select album to remove> '")
-            selected_album = fzf.prompt(formatted_albums)[0]
+            selected_album = REMOVE_ALBUM_FZF.prompt(formatted_albums)[0]
 
             # Get the album_id for the selected album
             target_album_id = album_id_map[selected_album]
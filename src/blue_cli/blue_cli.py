@@ -126,19 +126,21 @@ def preview():
 
 @preview.command()
 @click.argument("album")
+@click.option("--id", "by_id", is_flag=True, help="ALBUM is a Tidal album id")
 @with_tidal_service
-def tracks(tidal: TidalService, album):
+def tracks(tidal: TidalService, album, by_id):
     """Show album tracks"""
-    tracks = tidal.get_album_tracks(album)
+    tracks = tidal.get_album_tracks_by_id(album) if by_id else tidal.get_album_tracks(album)
     tidal.print_tracks(tracks)
 
 
 @preview.command()
 @click.argument("artist")
+@click.option("--id", "by_id", is_flag=True, help="ARTIST is a Tidal artist id")
 @with_tidal_service
-def album(tidal: TidalService, artist):
+def album(tidal: TidalService, artist, by_id):
     """Show artist albums"""
-    artist_id = tidal.get_artistid(artist)
+    artist_id = artist if by_id else tidal.get_artistid(artist)
     albums = tidal.get_albums(artist_id)
     artist_info = tidal.get_artis_info(artist_id)
     rprint(artist_info)
@@ -10,6 +10,7 @@ __version__ = "1.0.0"
 __author__ = "IbeeX"
 
 MEDIA_LOCATION = "Library"
+HTTP_WORKERS = 8  # Concurrent requests to the player for independent lookups
 AI_MODEL = "openai/gpt-5.1-chat"
 
 home = Path.home()
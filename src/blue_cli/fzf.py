@@ -0,0 +1,20 @@
+import contextlib
+import subprocess
+from collections.abc import Iterable
+
+
+def fzf_select(lines: Iterable[str], options: list[str]) -> str | None:
+    """Pipe `lines` into fzf as they are produced and return the selected line"""
+    with subprocess.Popen(
+        ["fzf", *options], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+    ) as proc:
+        assert proc.stdin is not None and proc.stdout is not None
+        # fzf exits without draining stdin when the user picks or aborts early
+        with contextlib.suppress(BrokenPipeError):
+            try:
+                for line in lines:
+                    proc.stdin.write(f"{line}\n")
+            finally:
+                proc.stdin.close()
+        selected = proc.stdout.read().split("\n", 1)[0]
+    return selected or None
@@ -0,0 +1,68 @@
+import functools
+import json
+import os
+import stat
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+
+# os.umask can only be read by setting it, so do that once before any threads start
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_json_cached(path: str, mtime_ns: int, inode: int, size: int):
+    with open(path, "rb") as f:
+        return json.loads(f.read())
+
+
+@functools.lru_cache(maxsize=8)
+def _derive_json_cached(derive: Callable, path: str, mtime_ns: int, inode: int, size: int):
+    return derive(_load_json_cached(path, mtime_ns, inode, size))
+
+
+def _file_version(path: Path) -> tuple[str, int, int, int]:
+    st = os.stat(path)
+    # dump_json replaces the file, so a rewrite within one mtime tick still changes the inode
+    return str(path), st.st_mtime_ns, st.st_ino, st.st_size
+
+
+def load_json(path: Path):
+    """Load a JSON cache file, parsing it again only after the file changes.
+
+    The returned object is shared between callers and must not be mutated.
+    """
+    return _load_json_cached(*_file_version(path))
+
+
+def load_json_derived(path: Path, derive: Callable):
+    """Build a value such as a lookup index from a JSON cache file once per file version.
+
+    `derive` must be a module-level function, it is part of the cache key. The
+    returned object is shared between callers and must not be mutated.
+    """
+    return _derive_json_cached(derive, *_file_version(path))
+
+
+def _file_mode(path: Path) -> int:
+    """Permissions of the existing file, or those open() would give a new one"""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def dump_json(path: Path, data, **kwargs) -> None:
+    """Write JSON through a temporary file so readers never see a partial file"""
+    # A unique temporary name per call, concurrent writers must not replace each other's file
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(json.dumps(data, **kwargs))
+        # mkstemp creates the file 0600 and os.replace would keep that mode
+        os.chmod(tmp_path, _file_mode(path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
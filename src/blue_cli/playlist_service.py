@@ -1,11 +1,18 @@
 #!/usr/bin/env python3
 # -*- coding: UTF-8 -*-
 from dataclasses import dataclass
+from functools import cached_property
 
-import jmespath
-import xmltodict
 from requests import Response
 
+PLAYLIST_SONG_FIELDS = {
+    "id": "id",
+    "artist": "art",
+    "album": "alb",
+    "title": "title",
+    "album_id": "albumid",
+}
+
 
 @dataclass
 class PlaylistSong:
@@ -27,9 +34,17 @@ class PlaylistInfo:
 
     songs: list[PlaylistSong]
 
+    @cached_property
+    def songs_by_album_id(self) -> dict[int, list[PlaylistSong]]:
+        """Songs grouped by album_id in queue order, built once per playlist"""
+        index: dict[int, list[PlaylistSong]] = {}
+        for song in self.songs:
+            index.setdefault(song.album_id, []).append(song)
+        return index
+
     def get_songs_by_album_id(self, album_id: int) -> list[PlaylistSong]:
         """Get all songs from a specific album"""
-        return [song for song in self.songs if song.album_id == album_id]
+        return list(self.songs_by_album_id.get(album_id, []))
 
     @staticmethod
     def _get_dominant_artist(artists: list[str]) -> str:
@@ -98,29 +113,27 @@ class PlaylistInfo:
             return []
 
         blocks = []
-        current_key = (self.songs[0].album, self.songs[0].album_id)
+        first = self.songs[0]
+        current_album, current_album_id = first.album, first.album_id
         block_count = 1
-        block_last_id = self.songs[0].id
-        block_artists = [self.songs[0].artist]
+        block_last_id = first.id
+        block_artists = [first.artist]
 
         for song in self.songs[1:]:
-            song_key = (song.album, song.album_id)
-            if song_key == current_key:
+            if song.album_id == current_album_id and song.album == current_album:
                 block_count += 1
                 block_last_id = song.id
                 block_artists.append(song.artist)
             else:
-                album, album_id = current_key
                 artist = self._get_dominant_artist(block_artists)
-                blocks.append((artist, album, block_count, album_id, block_last_id))
-                current_key = song_key
+                blocks.append((artist, current_album, block_count, current_album_id, block_last_id))
+                current_album, current_album_id = song.album, song.album_id
                 block_count = 1
                 block_last_id = song.id
                 block_artists = [song.artist]
 
-        album, album_id = current_key
         artist = self._get_dominant_artist(block_artists)
-        blocks.append((artist, album, block_count, album_id, block_last_id))
+        blocks.append((artist, current_album, block_count, current_album_id, block_last_id))
         return blocks
 
     def find_song_by_id(self, song_id: int) -> PlaylistSong | None:
@@ -162,32 +175,19 @@ class PlaylistService:
 
     def _parse_playlist_response(self, response: Response) -> PlaylistInfo:
         """Parse playlist XML response into PlaylistInfo"""
-        obj = xmltodict.parse(response.text, attr_prefix="", dict_constructor=dict)
-        if obj is None:
-            from click import ClickException
-
-            from .console import console
-
-            console.show_cursor()
-            raise ClickException("Output parsing error")
-
-        # Extract all required fields: id, artist, album, title, albumid
-        songs_data = jmespath.search("playlist.song[].[id, art, alb, title, albumid]", obj)
-
-        if not songs_data:
-            return PlaylistInfo(songs=[])
-
-        songs = []
-        for song_data in songs_data:
-            if len(song_data) >= 5:  # Ensure we have all required fields
-                song = PlaylistSong(
-                    id=int(song_data[0]),
-                    artist=song_data[1] or "",
-                    album=song_data[2] or "",
-                    title=song_data[3] or "",
-                    album_id=int(song_data[4]) if song_data[4] else 0,
-                )
-                songs.append(song)
+        records, _ = self.base_client._parse_records(
+            response, "playlist", "song", PLAYLIST_SONG_FIELDS
+        )
+        songs = [
+            PlaylistSong(
+                id=int(record["id"]),
+                artist=record["artist"] or "",
+                album=record["album"] or "",
+                title=record["title"] or "",
+                album_id=int(record["album_id"]) if record["album_id"] else 0,
+            )
+            for record in records
+        ]
 
         return PlaylistInfo(songs=songs)
 
@@ -211,11 +211,6 @@ class PlaylistService:
         playlist = self.get_playlist()
         return playlist.get_albums_with_last_song_id()
 
-    def get_album_blocks(self) -> list[tuple[str, str, int, int, int]]:
-        """Get contiguous album blocks (treats duplicate albums as separate entries)"""
-        playlist = self.get_playlist()
-        return playlist.get_contiguous_album_blocks()
-
     def get_albums_up_to_current(
         self, current_song_id: int, current_artist: str, current_album: str
     ) -> list[tuple[str, str, int, int, int]]:
@@ -237,7 +232,7 @@ class PlaylistService:
 
                 # Use the song ID of the FIRST occurrence (this song), not the max
                 first_song_id = song.id
-                count = sum(1 for s in playlist.songs if s.album_id == song.album_id)
+                count = len(playlist.songs_by_album_id[song.album_id])
 
                 filtered_albums.append(
                     (song.artist, song.album, count, song.album_id, first_song_id)
@@ -1,22 +1,50 @@
-import json
+import contextlib
+import functools
 import pickle
 import random
 import re
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 import html2text
-import jmespath
+from click import ClickException
 from diskcache import Cache
-from pyfzf.pyfzf import FzfPrompt
 from rich import print as rprint
 
 from .base_client import BluesoundBaseClient
-from .config import cache_path
+from .config import HTTP_WORKERS, cache_path
 from .console import console
+from .fzf import fzf_select
+from .json_cache import dump_json, load_json, load_json_derived
 
 cache = Cache(cache_path, disk_pickle_protocol=pickle.HIGHEST_PROTOCOL)
 
+
+def _copy_records(result):
+    """Copy a list of flat record dicts, other results are returned as they are"""
+    if isinstance(result, list):
+        return [dict(x) if isinstance(x, dict) else x for x in result]
+    return result
+
+
+def two_level_cache(expire: int):
+    """Memoize in process memory in front of the diskcache store"""
+
+    def decorator(func):
+        # Repeat calls within one invocation skip diskcache's sqlite read and unpickling
+        cached = functools.lru_cache(maxsize=256)(cache.memoize(expire=expire)(func))
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # The LRU holds one object per call, callers get copies they are free to change
+            return _copy_records(cached(*args, **kwargs))
+
+        return wrapper
+
+    return decorator
+
+
 h = html2text.HTML2Text()
 h.ignore_links = True
 h.ignore_images = True
@@ -32,18 +60,67 @@ ALBUM_VARIANT_PATTERNS = [
     "bonus",
     "demo",
 ]
-
-
+PARENTHESIZED_RE = re.compile(r"\((.*?)\)")
+
+ARTIST_FIELDS = {"id": "artistid", "name": "#text"}
+ALBUM_FIELDS = {
+    "id": "albumid",
+    "title": "title",
+    "tracks": "tracks",
+    "quality": "quality",
+    "date": "date",
+    "artist": "art",
+}
+ARTIST_ALBUM_FIELDS = {**ALBUM_FIELDS, "artistid": "artistid"}
+SONG_FIELDS = {
+    "id": "songid",
+    "title": "title",
+    "artist": "art",
+    "quality": "quality",
+    "time": "time",
+    "artistid": "artistid",
+}
+
+# Hidden-id pickers: the first tab-separated field (an album or artist id, or a list index)
+# is kept out of the fzf display, so previews and selections skip re-parsing the shown line
+HIDDEN_ID_FZF_OPTIONS = ["--tmux", "90%,80%", "--delimiter", "\t", "--with-nth", "2.."]
+ALBUM_FZF_OPTIONS = [*HIDDEN_ID_FZF_OPTIONS, "--preview", "b pr tracks --id {1}"]
+ARTIST_FZF_OPTIONS = [*HIDDEN_ID_FZF_OPTIONS, "--preview", "b pr album --id {1}"]
+
+
+class TidalEmptyResult(ClickException):
+    """A Tidal query or interactive selection returned nothing"""
+
+
+def _artist_ids_by_name(artists: list[dict]) -> dict[str, str]:
+    # Reversed so the first cached entry wins on duplicate names
+    return {x["name"]: x["id"] for x in reversed(artists)}
+
+
+def _album_ids_by_release(albums: list[dict]) -> tuple[dict, dict]:
+    """Album ids keyed by (artist, title, date, tracks, quality) and without the artist"""
+    by_artist = {}
+    by_release = {}
+    # Reversed so the first cached entry wins on duplicate keys
+    for x in reversed(albums):
+        release = (x["title"], x["date"], x["tracks"], x["quality"])
+        by_artist[(x["artist"], *release)] = x["id"]
+        by_release[release] = x["id"]
+    return by_artist, by_release
+
+
+@functools.lru_cache(maxsize=4096)
 def _is_album_variant(title: str) -> bool:
     """Check if album title indicates a variant (deluxe, remix, etc.)"""
     title_lower = title.lower()
-    matches = re.findall(r"\((.*?)\)", title_lower)
+    matches = PARENTHESIZED_RE.findall(title_lower)
     for content in matches:
         if any(pattern in content for pattern in ALBUM_VARIANT_PATTERNS):
             return True
     return False
 
 
+@functools.lru_cache(maxsize=4096)
 def _get_base_album_name(title: str) -> str:
     """Extract base album name without variant info in parentheses"""
     if "(" in title:
@@ -74,7 +151,7 @@ def _select_best_album(albums: list, prefer_latest: bool = True):
 
     while remaining:
         if prefer_latest:
-            candidate = sorted(remaining, key=lambda x: x["date"], reverse=True)[0]
+            candidate = max(remaining, key=lambda x: x["date"])
         else:
             candidate = random.choice(remaining)
 
@@ -95,10 +172,7 @@ def _select_best_album(albums: list, prefer_latest: bool = True):
 
 
 class TidalService(BluesoundBaseClient):
-    def __init__(self, host: str, port: int) -> None:
-        super().__init__(host, port)
-
-    @cache.memoize(expire=60 * 60 * 24)
+    @two_level_cache(expire=60 * 60 * 24)
     def search_artists(self, artist: str = "") -> list[Any]:
         if artist:
             artist_name_url_encoded = urllib.parse.quote(f'"{artist}"')
@@ -110,87 +184,54 @@ class TidalService(BluesoundBaseClient):
 
         while url:
             r = self._make_request(url)
-            obj = self._parse_xml(r)
-
-            if "error" in obj or "artists" not in obj or "art" not in obj["artists"]:
-                return artists
-
-            search_insert = "[]" if isinstance(obj["artists"]["art"], list) else ""
-            search_string = f'artists.art{search_insert}.{{ "id": artistid, "name": "#text" }}'
-
-            _artists = jmespath.search(search_string, obj)
-            artists.extend(_artists if isinstance(_artists, list) else [_artists])
-
-            url = (
-                jmespath.search("artists.nextlink", obj)
-                if jmespath.search("artists.nextlink", obj)
-                else None
-            )
+            _artists, url = self._parse_records(r, "artists", "art", ARTIST_FIELDS)
+            if not _artists:
+                break
+            artists.extend(_artists)
 
         if not artists:
             return artists
 
         cache_file = cache_path / "artists.json"
         try:
-            with open(cache_file) as f:
-                artists_cache = json.load(f)
+            artists_cache = load_json(cache_file)
 
-            # Use list comprehension for lookup
-            new_artists = [x for x in artists if x not in artists_cache]
+            known = {(x["id"], x["name"]) for x in artists_cache}
+            new_artists = [x for x in artists if (x["id"], x["name"]) not in known]
             if new_artists:
-                artists_cache.extend(new_artists)
-                with open(cache_file, "w") as f:
-                    json.dump(artists_cache, f)
+                dump_json(cache_file, artists_cache + new_artists)
 
         except FileNotFoundError:
-            with open(cache_file, "w") as f:
-                json.dump(artists, f)
+            dump_json(cache_file, artists)
 
         return artists
 
     def get_artistid(self, artist: str) -> str:
-        artists = json.load(open(cache_path / "artists.json"))
-        artist_id = [x["id"] for x in artists if x["name"] == artist][0]
-        return artist_id
+        return load_json_derived(cache_path / "artists.json", _artist_ids_by_name)[artist]
 
-    @cache.memoize(expire=60 * 60 * 24)
+    @two_level_cache(expire=60 * 60 * 24)
     def get_albums(self, artist_id=""):
         url = f"Albums?service=Tidal&artistid={artist_id}"
         albums = []
 
         while url:
             r = self._make_request(url)
-            obj = self._parse_xml(r)
-            if "error" in obj or "album" not in obj["albums"]:
-                return albums
-
-            search_insert = "[]" if isinstance(obj["albums"]["album"], list) else ""
-            search_string = f'albums.album{search_insert}.{{ "id": albumid, "title": title, "artistid": artistid, "tracks": tracks, "quality": quality, "artist": art, "date": date }}'
-
-            _albums = jmespath.search(search_string, obj)
-            albums.extend(_albums if isinstance(_albums, list) else [_albums])
-
-            url = (
-                jmespath.search("albums.nextlink", obj)
-                if jmespath.search("albums.nextlink", obj)
-                else None
-            )
-
-        if not albums:
-            rprint("No albums found.")
-            exit(1)
+            _albums, url = self._parse_records(r, "albums", "album", ARTIST_ALBUM_FIELDS)
+            if not _albums:
+                break
+            albums.extend(_albums)
 
         return albums
 
-    @cache.memoize(expire=60 * 60 * 24 * 30)
+    @two_level_cache(expire=60 * 60 * 24 * 30)
     def get_artis_info(self, artist_id=""):
         url = f"Info?service=Tidal&artistid={artist_id}"
         r = self._make_request(url)
         text = h.handle(r.text)
-        # show first 20 linse of the artist info
-        if len(text.split("\n")) > 20:
-            info = text.split("\n")[:20]
-            return "\n".join(info) + "\n...\n"
+        # show first 20 lines of the artist info, without splitting the whole bio
+        lines = text.split("\n", 20)
+        if len(lines) > 20:
+            return "\n".join(lines[:20]) + "\n...\n"
         return text
 
     def print_albums(self, albums):
@@ -203,35 +244,24 @@ class TidalService(BluesoundBaseClient):
             )
 
     # @cache.memoize(expire=60 * 60 * 24 * 7)
-    def search_albums(self, album: str):
+    def search_albums(self, album: str, write_album_cache: bool = True):
+        """Search Tidal albums, albums.json backs the interactive track preview"""
         album_name_url_encoded = urllib.parse.quote(f'"{album}"')
         url = f"Albums?service=Tidal&expr={album_name_url_encoded}"
         albums = []
 
         while url:
             r = self._make_request(url)
-            obj = self._parse_xml(r)
-            if "error" in obj or "albums" not in obj or "album" not in obj["albums"]:
-                return albums
-
-            search_insert = "[]" if isinstance(obj["albums"]["album"], list) else ""
-
-            search_string = f'albums.album{search_insert}.{{ "id": albumid, "title": title, "tracks": tracks, "quality": quality, "date": date, "artist": art}}'
-            _albums = jmespath.search(search_string, obj)
-            albums.extend(_albums if isinstance(_albums, list) else [_albums])
-            url = (
-                jmespath.search("albums.nextlink", obj)
-                if jmespath.search("albums.nextlink", obj)
-                else None
-            )
+            _albums, url = self._parse_records(r, "albums", "album", ALBUM_FIELDS)
+            if not _albums:
+                break
+            albums.extend(_albums)
 
-        if not albums:
-            rprint("No albums found.")
-            exit(1)
-        json.dump(albums, open(cache_path / "albums.json", "w"))
+        if albums and write_album_cache:
+            dump_json(cache_path / "albums.json", albums)
         return albums
 
-    @cache.memoize(expire=60 * 60 * 24 * 7)
+    @two_level_cache(expire=60 * 60 * 24 * 7)
     def search_songs(self, song: str):
         song_name_url_encoded = urllib.parse.quote(f'"{song}"')
         url = f"Songs?service=Tidal&expr={song_name_url_encoded}"
@@ -239,93 +269,39 @@ class TidalService(BluesoundBaseClient):
 
         while url:
             r = self._make_request(url)
-            obj = self._parse_xml(r)
-
-            if "error" in obj or "songs" not in obj or "song" not in obj["songs"]:
-                return songs
-
-            search_insert = "[]" if isinstance(obj["songs"]["song"], list) else ""
-
-            search_string = f'songs.song{search_insert}.{{ "id": songid, "title": title, "artist": art, "quality": quality, "time": time, "artistid": artistid}}'
-            _songs = jmespath.search(search_string, obj)
-            songs.extend(_songs if isinstance(_songs, list) else [_songs])
-            url = (
-                jmespath.search("songs.nextlink", obj)
-                if jmespath.search("songs.nextlink", obj)
-                else None
-            )
+            _songs, url = self._parse_records(r, "songs", "song", SONG_FIELDS)
+            if not _songs:
+                break
+            songs.extend(_songs)
 
-        if not songs:
-            rprint("No song found.")
-            exit(1)
-        json.dump(songs, open(cache_path / "songs.json", "w"))
+        if songs:
+            dump_json(cache_path / "songs.json", songs)
         return songs
 
     def select_album(self, albums):
         SEPARATOR = chr(31)
-        artist_albums = [
-            f"{x['artist']}{SEPARATOR}: {x['title']} {SEPARATOR}/ {x['date']} - {x['tracks']} - {x['quality']}"
+        artist_albums = (
+            f"{x['id']}\t{x['artist']}{SEPARATOR}: {x['title']} {SEPARATOR}/ {x['date']} - {x['tracks']} - {x['quality']}"
             for x in albums
-        ]
-        fzf = FzfPrompt("fzf --tmux 90%,80% --preview 'b pr tracks {}'")
-        try:
-            selected_album = fzf.prompt(artist_albums)[0]
-        except IndexError:
-            rprint("No album found or selected.")
-            exit(1)
-
-        artist, rest = selected_album.split(f"{SEPARATOR}: ", maxsplit=1)
-        title, metadata = rest.split(f" {SEPARATOR}/ ", maxsplit=1)
-        quality = metadata.split(" - ")[2].strip()
-        album_id = next(
-            (
-                album["id"]
-                for album in albums
-                if album["artist"] == artist
-                and album["title"] == title
-                and album["quality"] == quality
-            ),
-            None,
         )
+        selected = fzf_select(artist_albums, ALBUM_FZF_OPTIONS)
+        if selected is None:
+            raise TidalEmptyResult("No album found or selected.")
 
-        if not album_id:
-            rprint("Could not find matching album.")
-            exit(1)
-
+        album_id, selected_album = selected.split("\t", maxsplit=1)
         return album_id, selected_album
 
     def select_song(self, songs):
-        SEPARATOR = chr(31)
-        formatted_songs = [
-            f"{song['artist']}{SEPARATOR}: {song['title']} {SEPARATOR}/ {int(song['time']) // 60}:{int(song['time']) % 60:02d} - {song['quality']}"
-            for song in songs
-        ]
-        fzf = FzfPrompt("fzf --tmux 90%,80%")
-        try:
-            selected_song = fzf.prompt(formatted_songs)[0]
-        except IndexError:
-            rprint("No song found or selected.")
-            exit(1)
-
-        artist, rest = selected_song.split(f"{SEPARATOR}: ", maxsplit=1)
-        title, metadata = rest.split(f" {SEPARATOR}/ ", maxsplit=1)
-        quality = metadata.split(" - ")[1].strip()
-        song_id = next(
-            (
-                song["id"]
-                for song in songs
-                if song["artist"] == artist
-                and song["title"] == title
-                and song["quality"] == quality
-            ),
-            None,
+        formatted_songs = (
+            f"{i}\t{song['artist']}: {song['title']} / {int(song['time']) // 60}:{int(song['time']) % 60:02d} - {song['quality']}"
+            for i, song in enumerate(songs)
         )
+        selected = fzf_select(formatted_songs, HIDDEN_ID_FZF_OPTIONS)
+        if selected is None:
+            raise TidalEmptyResult("No song found or selected.")
 
-        if not song_id:
-            rprint("Could not find matching song.")
-            exit(1)
-
-        return song_id, selected_song
+        index, selected_song = selected.split("\t", maxsplit=1)
+        return songs[int(index)]["id"], selected_song
 
     def parse_album_string(self, album: str) -> tuple[str, str, str, str | None, str]:
         SEPARATOR = chr(31)  # ␟ character
@@ -357,30 +333,30 @@ class TidalService(BluesoundBaseClient):
     def get_album_tracks(self, album: str):
         album_name, album_date, album_tracks, album_quality, artist = self.parse_album_string(album)
 
-        albums = json.load(open(cache_path / "albums.json"))
-        criteria = {
-            "title": album_name,
-            "date": album_date,
-            "tracks": album_tracks,
-            "quality": album_quality,
-        }
-        if artist:
-            criteria["artist"] = artist
-
-        album_id = [
-            x["id"] for x in albums if all(x[key] == value for key, value in criteria.items())
-        ][0]
+        by_artist, by_release = load_json_derived(cache_path / "albums.json", _album_ids_by_release)
+        release = (album_name, album_date, album_tracks, album_quality)
+        # The artist only narrows the match when the display string has one
+        album_id = by_artist[(artist, *release)] if artist else by_release[release]
         return self.get_album_tracks_by_id(album_id)
 
-    @cache.memoize(expire=60 * 60 * 24 * 30)
+    @two_level_cache(expire=60 * 60 * 24 * 30)
     def get_album_tracks_by_id(self, album_id: int):
         url = f"Songs?service=Tidal&albumid={album_id}"
         r = self._make_request(url)
         obj = self._parse_xml(r)
-        tracks = jmespath.search(
-            'songs.album.song[].{ "track": track, "title": title, "artist": art, "album": alb, "quality": quality, "duration": time, "date": date }',
-            obj,
-        )
+        songs = obj.get("songs", {}).get("album", {}).get("song", [])
+        tracks = [
+            {
+                "track": song.get("track"),
+                "title": song.get("title"),
+                "artist": song.get("art"),
+                "album": song.get("alb"),
+                "quality": song.get("quality"),
+                "duration": song.get("time"),
+                "date": song.get("date"),
+            }
+            for song in (songs if isinstance(songs, list) else [songs])
+        ]
 
         return tracks
 
@@ -392,16 +368,18 @@ class TidalService(BluesoundBaseClient):
         url = f"Add?service=Tidal&songid={song_id}&playnow=-1&where=last"
         self._make_request(url)
 
+    def _select_artist(self, artists: list[Any]) -> dict:
+        selected = fzf_select((f"{x['id']}\t{x['name']}" for x in artists), ARTIST_FZF_OPTIONS)
+        if selected is None:
+            raise TidalEmptyResult("No artist found or selected.")
+
+        artist_id, artist_name = selected.split("\t", maxsplit=1)
+        return {"id": artist_id, "name": artist_name}
+
     def select_albums_by_artists(self, artists: list[Any]):
-        fzf = FzfPrompt("fzf --tmux 90%,80% --preview 'b pr album {}'")
-        try:
-            artist = fzf.prompt([x["name"] for x in artists])[0]
-        except IndexError:
-            rprint("No artist found or selected.")
-            exit(1)
-        artist_id = [x["id"] for x in artists if x["name"] == artist][0]
+        artist_id = self._select_artist(artists)["id"]
         albums = self.get_albums(artist_id)
-        json.dump(albums, open(cache_path / "albums.json", "w"))
+        dump_json(cache_path / "albums.json", albums)
         return albums
 
     def cli_search_albums(self, album: str):
@@ -426,13 +404,25 @@ class TidalService(BluesoundBaseClient):
         while True:
             _artists = self.search_artists(artist)
             if not _artists:
-                rprint("No artists found.")
-                exit()
+                raise TidalEmptyResult("No artists found.")
             _albums = self.select_albums_by_artists(_artists)
             album_id, selected_album = self.select_album(_albums)
             self.add_album_to_queue(album_id)
             rprint(f"Added {selected_album} to queue.")
 
+    def _iter_artist_albums(self, artists: list[Any], batch_size: int):
+        """Yield (artist, albums future) in order, fetching each batch of artists concurrently"""
+        with ThreadPoolExecutor(max_workers=HTTP_WORKERS) as executor:
+            for start in range(0, len(artists), batch_size):
+                batch = artists[start : start + batch_size]
+                futures = [executor.submit(self.get_albums, artist["id"]) for artist in batch]
+                try:
+                    yield from zip(batch, futures, strict=True)
+                finally:
+                    # A caller that stops early does not wait for albums it will never use
+                    for future in futures:
+                        future.cancel()
+
     def add_latest_albums_from_favorites(
         self,
         number_of_albums: int,
@@ -443,32 +433,42 @@ class TidalService(BluesoundBaseClient):
     ):
         favorite_artists = self.search_artists()
         if random_selection:
-            random.shuffle(favorite_artists)
+            favorite_artists = random.sample(favorite_artists, len(favorite_artists))
 
         added_albums = []
         skipped_albums = []
-        for artist in favorite_artists:
-            if len(added_albums) >= number_of_albums:
-                break
+        batch_size = max(1, min(number_of_albums, HTTP_WORKERS))
+        fetches = contextlib.closing(self._iter_artist_albums(favorite_artists, batch_size))
+        with fetches as artist_albums:
+            # Checked before pulling the next artist, which may start another batch of fetches
+            while len(added_albums) < number_of_albums:
+                next_artist = next(artist_albums, None)
+                if next_artist is None:
+                    break
+                artist, future = next_artist
+                try:
+                    albums = future.result()
+                except Exception:
+                    rprint(f"Could not fetch albums for {artist['name']}.")
+                    continue
 
-            albums = self.get_albums(artist["id"])
-            if not albums:
-                continue
+                if not albums:
+                    continue
 
-            if include_variants:
-                if random_random:
-                    selected = random.choice(albums)
+                if include_variants:
+                    if random_random:
+                        selected = random.choice(albums)
+                    else:
+                        selected = max(albums, key=lambda x: x["date"])
                 else:
-                    selected = sorted(albums, key=lambda x: x["date"], reverse=True)[0]
-            else:
-                selected, skipped = _select_best_album(albums, prefer_latest=not random_random)
-                skipped_albums.extend(skipped)
+                    selected, skipped = _select_best_album(albums, prefer_latest=not random_random)
+                    skipped_albums.extend(skipped)
 
-                if not selected:
-                    continue
+                    if not selected:
+                        continue
 
-            self.add_album_to_queue(selected["id"])
-            added_albums.append(f"{artist['name']}: {selected['title']}")
+                self.add_album_to_queue(selected["id"])
+                added_albums.append(f"{artist['name']}: {selected['title']}")
 
         rprint(f"[bold green]Added {'random' if random_random else 'latest'} albums:[/bold green]")
         for album in added_albums:
@@ -495,20 +495,7 @@ class TidalService(BluesoundBaseClient):
 
     def select_artist_for_favorites(self, artists: list[Any]):
         """Select an artist using fzf with preview of artist info and albums"""
-        fzf = FzfPrompt("fzf --tmux 90%,80% --preview 'b pr album {}'")
-        try:
-            artist_name = fzf.prompt([x["name"] for x in artists])[0]
-        except IndexError:
-            rprint("No artist found or selected.")
-            exit(1)
-
-        # Find the selected artist
-        selected_artist = next((x for x in artists if x["name"] == artist_name), None)
-        if not selected_artist:
-            rprint("Could not find matching artist.")
-            exit(1)
-
-        return selected_artist
+        return self._select_artist(artists)
 
     def cli_favorite_artist(self, artist: str):
         """Search for artists and add selected one to favorites"""
@@ -4,19 +4,40 @@ import html
 import json
 import random
 import sys
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 from pathlib import Path
-from typing import Any
 
-import jmespath
 from pyfzf.pyfzf import FzfPrompt
-from requests import get
 
 from .base_client import BluesoundBaseClient
-from .config import MEDIA_LOCATION
+from .config import HTTP_WORKERS, MEDIA_LOCATION
 from .console import console
+from .json_cache import dump_json
 
 rprint = console.print
 
+FZF = FzfPrompt("fzf --tmux 90%,80%")
+
+BROWSE_ALBUM_FIELDS = {"url": "playURL", "Artist": "text2", "Album": "text"}
+
+
+def _browse_items(obj: dict) -> list[dict]:
+    """Items of a Browse response, a single item is still returned as a list"""
+    items = obj.get("browse", {}).get("item", [])
+    return items if isinstance(items, list) else [items]
+
+
+def _browse_key(obj: dict, text: str) -> str:
+    """browseKey of the Browse item labelled `text`"""
+    key = next(
+        (item.get("browseKey") for item in _browse_items(obj) if item.get("text") == text), None
+    )
+    if not isinstance(key, str):
+        raise KeyError(text)
+    return key
+
 
 class Cachefmanager:
     def __init__(self) -> None:
@@ -35,22 +56,18 @@ class Cachefmanager:
             cache_size = 1
         return cache_size
 
-    def load_cache(self, cache_file: Path) -> list[str]:
+    def load_cache(self, cache_file: Path, size: int) -> tuple[deque[str], set[str]]:
+        """Bounded cache of recently added albums plus a set for membership tests"""
         json_cache: str = ""
         if not cache_file.is_file():
-            return []
+            return deque(maxlen=size), set()
         with cache_file.open() as f:
             json_cache = f.read()
-        return json.loads(json_cache)
+        data: list[str] = json.loads(json_cache)
+        return deque(data, maxlen=size), set(data)
 
     def save_cache(self, cache_file, cache):
-        with cache_file.open(mode="w") as f:
-            f.write(json.dumps(cache, indent=4, sort_keys=True))
-
-    def enforce_cache_size(self, size: int, cache: list[Any]) -> list[Any]:
-        if len(cache) > size:
-            return cache[len(cache) - size :]
-        return cache
+        dump_json(cache_file, list(cache), indent=4, sort_keys=True)
 
 
 class UsbService(BluesoundBaseClient):
@@ -58,52 +75,62 @@ class UsbService(BluesoundBaseClient):
         super().__init__(host, port)
         self.cache_manager = Cachefmanager()
 
-    def get_usb_service(self) -> str:
+    @cached_property
+    def usb_key(self) -> str:
+        """Browse key of the USB library, stable while the device stays attached"""
         r = self._make_request("Browse")
         obj = self._parse_xml(r.text)
-        key = jmespath.search(f"browse.item[?text=='{MEDIA_LOCATION}'].browseKey", obj)
-        if not isinstance(key, list):
-            raise KeyError
-        if not isinstance(key[0], str):
-            raise KeyError
-        return key[0]
+        return _browse_key(obj, MEDIA_LOCATION)
+
+    @cached_property
+    def albums_key(self) -> str:
+        """Browse key of the "Albums" node inside the USB library"""
+        r = self._make_request("Browse", params={"key": self.usb_key})
+        obj = self._parse_xml(r.text)
+        return _browse_key(obj, "Albums")
+
+    def enqueue_album(self, album_url: str):
+        """Append a Browse playURL to the end of the queue instead of playing it now"""
+        # Rewritten here rather than in all_albums, only a few of the listed albums get enqueued
+        super().enqueue_album(album_url.replace("playnow=1", "playnow=-1&where=last", 1))
 
     def search(self):
         s = console.status("Gathering artist...")
         s.start()
-        albums = self.all_albums()
-        artists = sorted(set([x["Artist"] for x in albums]))
-        fzf = FzfPrompt("fzf --tmux 90%,80%")
+        # artist -> album -> url, the first url wins for duplicate albums
+        albums_by_artist: dict[str, dict[str, str]] = defaultdict(dict)
+        for x in self.all_albums():
+            albums_by_artist[x["Artist"]].setdefault(x["Album"], x["url"])
+        artists = sorted(albums_by_artist)
         s.stop()
         while True:
             try:
-                artist = fzf.prompt(artists)[0]
+                artist = FZF.prompt(artists)[0]
             except IndexError:
                 rprint("No artist found or selected.")
                 exit(1)
-            albums_artist = sorted(set([x["Album"] for x in albums if x["Artist"] == artist]))
+            albums_artist = sorted(albums_by_artist[artist])
             try:
-                artist_albums = fzf.prompt(albums_artist, "--multi")
+                artist_albums = FZF.prompt(albums_artist, "--multi")
             except ImportError:
                 rprint("No album found or selected.")
                 exit(1)
             for album in artist_albums:
-                album_url = [x for x in albums if x["Artist"] == artist and x["Album"] == album][0][
-                    "url"
-                ]
-                self.enqueue_album(album_url)
+                self.enqueue_album(albums_by_artist[artist][album])
                 rprint(f"{artist}: {album} [green]Added[/]")
 
     def search_albums(self):
         s = console.status("Gathering albums...")
         s.start()
-        albums = self.all_albums()
-        only_albums = sorted(set([x["Album"] for x in albums]))
-        fzf = FzfPrompt("fzf --tmux 90%,80%")
+        # album -> url, the first url wins for albums with the same title
+        url_by_album: dict[str, str] = {}
+        for x in self.all_albums():
+            url_by_album.setdefault(x["Album"], x["url"])
+        only_albums = sorted(url_by_album)
         s.stop()
         while True:
             try:
-                selected_albums = fzf.prompt(only_albums, "--multi")
+                selected_albums = FZF.prompt(only_albums, "--multi")
             except IndexError:
                 rprint("No album found.")
                 exit(1)
@@ -111,60 +138,43 @@ class UsbService(BluesoundBaseClient):
                 rprint("No album selected.")
                 exit(1)
             for album in selected_albums:
-                album_url = [x for x in albums if x["Album"] == album][0]["url"]
-                self.enqueue_album(album_url)
+                self.enqueue_album(url_by_album[album])
                 print(f"Added {album} to queue.")
 
     def all_albums(self) -> list[dict]:
         all_albums = []
-        usb_key = self.get_usb_service()
-        r = self._make_request("Browse", params={"key": usb_key})
+        r = self._make_request("Browse", params={"key": self.albums_key})
         obj = self._parse_xml(r.text)
-        key = jmespath.search("browse.item[?text=='Albums'].browseKey", obj)
-        if not isinstance(key, list):
-            raise KeyError
-        if not isinstance(key[0], str):
+        keys = [item.get("browseKey") for item in _browse_items(obj)]
+        if not all(isinstance(part, str) for part in keys):
             raise KeyError
-        r = self._make_request("Browse", params={"key": key[0]})
-        obj = self._parse_xml(r.text)
-        keys = jmespath.search("browse.item[].browseKey", obj)
-        if not isinstance(keys, list):
-            raise KeyError
-        for part in keys:
-            if not isinstance(part, str):
-                raise KeyError
-            r = self._make_request("Browse", params={"key": part})
-            obj = self._parse_xml(r.text)
-            albums = jmespath.search(
-                'browse.item[].{"url": playURL, "Artist": text2, "Album": text}', obj
+        with ThreadPoolExecutor(max_workers=HTTP_WORKERS) as executor:
+            responses = list(
+                executor.map(lambda part: self._make_request("Browse", params={"key": part}), keys)
             )
-            if not isinstance(albums, list):
-                raise KeyError
-            for album in albums:
-                if not isinstance(album, dict):
-                    raise KeyError
-                album["url"] = album["url"].replace("playnow=1", "playnow=-1&where=last")  # type: ignore
-                all_albums.append(album)
+        for r in responses:
+            records, _ = self._parse_records(r, "browse", "item", BROWSE_ALBUM_FIELDS)
+            all_albums.extend(records)
         return all_albums
 
     def enqueue_random_albums(self, number_off_albums: int):
         albums = self.all_albums()
         cache_file = self.cache_manager.get_cache_file()
-        cache = self.cache_manager.load_cache(cache_file)
         cache_size = self.cache_manager.get_cache_size(len(albums))
-        for _ in range(number_off_albums):
-            while True:
-                random_album = random.choice(albums)
-                album_url: str = random_album["url"]
-                random_album = f"{random_album['Album']}: {random_album['Artist']}"
-                if random_album in cache:
-                    continue
-                break
+        cache, cache_set = self.cache_manager.load_cache(cache_file, cache_size)
+        remaining: dict[str, str] = {}
+        for album in albums:
+            name = f"{album['Album']}: {album['Artist']}"
+            if name not in cache_set:
+                remaining.setdefault(name, album["url"])
+        # Sampling from the uncached albums avoids re-drawing when the cache covers most of them
+        picks = random.sample(list(remaining), min(number_off_albums, len(remaining)))
+        for random_album in picks:
             cache.append(random_album)
-            self.enqueue_album(album_url)
+            cache_set.add(random_album)
+            self.enqueue_album(remaining[random_album])
             rprint(f"{random_album} [green]Added[/]")
         rprint(f"{len(albums)} albums and [green]{len(cache)}[/] items in cache.")
-        cache = self.cache_manager.enforce_cache_size(cache_size, cache)
         self.cache_manager.save_cache(cache_file, cache)
 
     @staticmethod
@@ -198,7 +208,7 @@ class UsbService(BluesoundBaseClient):
             rprint("No song found or selected.")
             exit(1)
         next_album = song.split(":")[0].strip()
-        _ = get(f"{self.url}/Play", params={"id": next_album})
+        self._make_request("Play", params={"id": next_album})
 
     def next_album(self):
         """Skip to the next album"""
@@ -208,14 +218,11 @@ class UsbService(BluesoundBaseClient):
             self._make_request("Play", params={"id": next_song_id})
 
     def add_list_to_queue(self):
-        def get_album_url(albums, artist, album):
-            found_abums = []
-            for data in albums:
-                if album == data["Album"]:
-                    found_abums.append(data)
-            if found_abums and len(found_abums) == 1:
+        def get_album_url(by_album, artist, album):
+            found_abums = by_album.get(album, [])
+            if len(found_abums) == 1:
                 return found_abums[0]["url"]
-            elif found_abums and len(found_abums) > 1:
+            elif len(found_abums) > 1:
                 for _album in found_abums:
                     if _album["Artist"] in artist or artist in _album["Artist"]:
                         return _album["url"]
@@ -228,17 +235,19 @@ class UsbService(BluesoundBaseClient):
         random.shuffle(list_of_albums)
 
         added = 0
-        all_albums = self.all_albums()
+        by_album: dict[str, list[dict]] = defaultdict(list)
+        for data in self.all_albums():
+            by_album[data["Album"]].append(data)
 
         for line in list_of_albums:
             artist = line.split("-")[0].strip()
             album = line.split("-")[1].strip()
-            album_url = get_album_url(all_albums, artist, album)
+            album_url = get_album_url(by_album, artist, album)
             if not album_url:
                 rprint(f"{artist}: {album}", "[red]FAIL[/]")
                 continue
 
-            get(self.url + album_url)
+            self.enqueue_album(album_url)
             rprint(f"{artist}: {album} [green]Added[/]")
             added += 1
         rprint(f"Added [green]{added}[/] albums")
@@ -0,0 +1,18 @@
+"""Lightweight test doubles for the Tidal service."""
+
+from collections.abc import Callable, Mapping
+
+
+class StubTidal:
+    """Tidal service stand-in that answers album searches and records the queries."""
+
+    def __init__(self, results: Mapping[str, list[dict]] | Callable[[str], list[dict]]):
+        self.results = results
+        self.calls: list[tuple[str]] = []
+
+    def search_albums(self, album: str) -> list[dict]:
+        """Return the canned albums for `album`, or an empty list."""
+        self.calls.append((album,))
+        if callable(self.results):
+            return self.results(album)
+        return self.results.get(album, [])
@@ -1,44 +1,67 @@
 """Tests for AlbumSearchService improved search functionality."""
 
+import json
+import time
+from types import SimpleNamespace
 from unittest.mock import Mock
 
 import pytest
-
-from blue_cli.ai_service import AlbumSearchService, Recommendation, SearchError, SearchResult
+from _stubs import StubTidal
+
+from blue_cli.ai_service import (
+    AlbumSearcher,
+    AlbumSearchService,
+    Recommendation,
+    RecommendationAlbumSearcher,
+    SearchError,
+    SearchQuery,
+    SearchResult,
+    _bounded_levenshtein,
+)
+from blue_cli.tidal_service import TidalService
+
+# Sample album data for testing, shared read-only by every test
+SAMPLE_ALBUMS = (
+    {
+        "id": "305664133",
+        "artist": "A. R. Kane",
+        "title": "69",
+        "date": "1988-01-01",
+        "tracks": "10",
+    },
+    {
+        "id": "37267701",
+        "artist": "The Magnetic Fields",
+        "title": "69 Love Songs",
+        "date": "1999-09-07",
+        "tracks": "69",
+    },
+    {
+        "id": "108681532",
+        "artist": "Wilson Tanner",
+        "title": "69",
+        "date": "2016-04-01",
+        "tracks": "8",
+    },
+)
 
 
 class TestAlbumSearchService:
     """Test the AlbumSearchService class."""
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.mock_tidal_service = Mock()
-        self.search_service = AlbumSearchService(self.mock_tidal_service)
-
-        # Sample album data for testing
-        self.sample_albums = [
-            {
-                "id": "305664133",
-                "artist": "A. R. Kane",
-                "title": "69",
-                "date": "1988-01-01",
-                "tracks": "10",
-            },
-            {
-                "id": "37267701",
-                "artist": "The Magnetic Fields",
-                "title": "69 Love Songs",
-                "date": "1999-09-07",
-                "tracks": "69",
-            },
-            {
-                "id": "108681532",
-                "artist": "Wilson Tanner",
-                "title": "69",
-                "date": "2016-04-01",
-                "tracks": "8",
-            },
-        ]
+    @pytest.fixture(scope="class", autouse=True)
+    @classmethod
+    def _search_service(cls):
+        """Share one mock Tidal service and search service across the class."""
+        cls.mock_tidal_service = Mock()
+        cls.search_service = AlbumSearchService(cls.mock_tidal_service)
+        cls.sample_albums = SAMPLE_ALBUMS
+
+    @pytest.fixture(autouse=True)
+    def _reset_search_service(self):
+        """Start every test with a clean mock and an empty search cache."""
+        self.mock_tidal_service.reset_mock(return_value=True, side_effect=True)
+        self.search_service.clear_cache()
 
     def test_find_best_artist_match_exact_match(self):
         """Test exact artist name matching (case insensitive)."""
@@ -76,6 +99,35 @@ class TestAlbumSearchService:
         assert result["artist"] == "A. R. Kane"
         assert result["title"] == "69"
 
+    def test_find_best_artist_match_prefers_first_album(self):
+        """Albums by the same artist resolve to the first one in result order."""
+        albums = [
+            *self.sample_albums,
+            {**self.sample_albums[0], "id": "1", "title": "i"},
+        ]
+
+        # Exact match
+        result = self.search_service._find_best_artist_match(albums, "A. R. KANE")
+        assert result is not None
+        assert result["id"] == "305664133"
+
+        # Normalized match
+        result = self.search_service._find_best_artist_match(albums, "ARKane")
+        assert result is not None
+        assert result["id"] == "305664133"
+
+    def test_find_best_artist_match_typo(self):
+        """Test close misspellings fall back to the nearest normalized artist."""
+        albums = self.sample_albums
+
+        result = self.search_service._find_best_artist_match(albums, "Wilson Taner")
+        assert result is not None
+        assert result["artist"] == "Wilson Tanner"
+
+        result = self.search_service._find_best_artist_match(albums, "The Magnetic Feilds")
+        assert result is not None
+        assert result["artist"] == "The Magnetic Fields"
+
     def test_find_best_artist_match_no_match(self):
         """Test when no artist match is found."""
         albums = self.sample_albums
@@ -231,6 +283,30 @@ class TestAlbumSearchService:
         assert result.tracks == "10"
         assert result.found is True
 
+    def test_find_best_match_reuses_cached_search(self):
+        """Test repeated queries are served from the search cache until it is cleared."""
+        recommendation = Recommendation("A.R. Kane", "69")
+        self.mock_tidal_service.search_albums.return_value = self.sample_albums
+
+        self.search_service.find_best_match(recommendation)
+        self.search_service.find_best_match(recommendation)
+        self.mock_tidal_service.search_albums.assert_called_once_with("A.R. Kane 69")
+
+        self.search_service.clear_cache()
+        self.search_service.find_best_match(recommendation)
+        assert self.mock_tidal_service.search_albums.call_count == 2
+
+    def test_find_best_match_remembers_missing_album(self):
+        """Test a recommendation without results is not searched again."""
+        recommendation = Recommendation("Nonexistent Artist", "Unknown Album")
+        self.mock_tidal_service.search_albums.return_value = []
+
+        assert self.search_service.find_best_match(recommendation) is None
+        call_count = self.mock_tidal_service.search_albums.call_count
+
+        assert self.search_service.find_best_match(recommendation) is None
+        assert self.mock_tidal_service.search_albums.call_count == call_count
+
     def test_empty_albums_list_handling(self):
         """Test handling of empty albums list."""
         result = self.search_service._find_best_artist_match([], "Any Artist")
@@ -250,6 +326,156 @@ class TestAlbumSearchService:
         assert result is not None
 
 
+class TestParallelAlbumSearchService:
+    """Test AlbumSearchService with concurrent strategy prefetch."""
+
+    def setup_method(self):
+        """Set up a parallel search service over a query -> albums table."""
+        self.album = SAMPLE_ALBUMS[0]
+        self.results: dict[str, list[dict]] = {}
+        self.stub_tidal_service = StubTidal(self.results)
+        self.search_service = AlbumSearchService(self.stub_tidal_service, parallel=True)  # type: ignore[arg-type]
+
+    def test_prefetches_each_planned_query_once(self):
+        """Test every planned query is searched once, even when strategies re-run them."""
+        self.results["69"] = [self.album]
+
+        result = self.search_service.find_best_match(Recommendation("A.R. Kane", "69"))
+
+        assert result is not None
+        assert result.id == 305664133
+        assert sorted(self.stub_tidal_service.calls) == sorted(
+            [("A.R. Kane 69",), ("69",), ("AR Kane 69",), ("A R Kane 69",)]
+        )
+
+    def test_priority_order_is_kept(self):
+        """Test the basic search wins over later strategies that also found albums."""
+        self.results["A.R. Kane 69"] = [self.album]
+        self.results["69"] = [SAMPLE_ALBUMS[2]]
+
+        result = self.search_service.find_best_match(Recommendation("A.R. Kane", "69"))
+
+        assert result is not None
+        assert result.id == 305664133
+
+    def test_prefetch_error_is_reported(self):
+        """Test a search the strategies need still surfaces as a SearchError."""
+
+        def failing_search(query):
+            raise Exception("API Error")
+
+        self.stub_tidal_service.results = failing_search
+
+        with pytest.raises(SearchError, match="API Error"):
+            self.search_service.find_best_match(Recommendation("A.R. Kane", "69"))
+
+    def test_failed_speculative_query_is_ignored(self):
+        """Test a failing fallback query does not fail a match the basic query found."""
+
+        def search(query):
+            if query != "A.R. Kane 69":
+                raise Exception("API Error")
+            return [self.album]
+
+        self.stub_tidal_service.results = search
+
+        result = self.search_service.find_best_match(Recommendation("A.R. Kane", "69"))
+
+        assert result is not None
+        assert result.id == 305664133
+
+
+class TestParallelSearchWithTidalService:
+    """Test the parallel prefetch against the real TidalService.search_albums."""
+
+    @pytest.fixture(autouse=True)
+    def _albums_cache_dir(self, tmp_path, monkeypatch):
+        """Point the albums.json cache at a temporary directory."""
+        self.cache_dir = tmp_path
+        monkeypatch.setattr("blue_cli.tidal_service.cache_path", tmp_path)
+
+    @staticmethod
+    def fake_make_request(url):
+        """Answer every album search with one album, slowly enough for searches to overlap."""
+        time.sleep(0.002)
+        return SimpleNamespace(
+            content=(
+                b'<albums><album albumid="305664133" title="69" tracks="10" quality="cd"'
+                b' date="1988-01-01"><art>A. R. Kane</art></album></albums>'
+            )
+        )
+
+    def find_matches(
+        self, tidal_service: TidalService, album_searcher: AlbumSearcher | None = None
+    ) -> list[SearchResult | None]:
+        """Run 30 distinct recommendations through a parallel search service."""
+        tidal_service._make_request = self.fake_make_request  # type: ignore[method-assign]
+        search_service = AlbumSearchService(
+            tidal_service, parallel=True, album_searcher=album_searcher
+        )
+        return [
+            search_service.find_best_match(Recommendation("A.R. Kane", f"69 take {i}"))
+            for i in range(30)
+        ]
+
+    def test_concurrent_album_cache_writes(self):
+        """Test prefetch threads writing albums.json never fail a recommendation."""
+        results = self.find_matches(TidalService("example.com", 11000))
+
+        assert all(result is not None and result.id == 305664133 for result in results)
+        assert [path.name for path in self.cache_dir.iterdir()] == ["albums.json"]
+        assert json.loads((self.cache_dir / "albums.json").read_text())[0]["id"] == "305664133"
+
+    def test_recommendation_searches_skip_album_cache(self):
+        """Test recommendation searches do not write albums.json."""
+        tidal_service = TidalService("example.com", 11000)
+        results = self.find_matches(tidal_service, RecommendationAlbumSearcher(tidal_service))
+
+        assert all(result is not None for result in results)
+        assert list(self.cache_dir.iterdir()) == []
+
+
+class TestSearchQuery:
+    """Test the SearchQuery value object."""
+
+    def test_artist_variation_queries(self):
+        """Test variations are distinct, single spaced and differ from the artist."""
+        query = SearchQuery("A.R. Kane", "69")
+
+        assert list(query.artist_variation_queries()) == [
+            "AR Kane 69",
+            "A R Kane 69",
+            "A.R.Kane 69",
+        ]
+
+    def test_artist_variation_queries_are_lazy(self):
+        """Test variations are only built as far as they are consumed."""
+        queries = SearchQuery("A.R. Kane", "69").artist_variation_queries()
+
+        assert next(queries) == "AR Kane 69"
+
+    def test_artist_variation_queries_plain_name(self):
+        """Test a name without periods or spaces has no variations."""
+        assert list(SearchQuery("Low", "Secret Name").artist_variation_queries()) == []
+
+
+class TestBoundedLevenshtein:
+    """Test the banded edit distance used for typo matching."""
+
+    def test_distance_within_bound(self):
+        """Test distances up to the bound are exact."""
+        assert _bounded_levenshtein("kitten", "sitting", 3) == 3
+        assert _bounded_levenshtein("tanner", "taner", 1) == 1
+        assert _bounded_levenshtein("same", "same", 0) == 0
+        assert _bounded_levenshtein("", "abc", 3) == 3
+
+    def test_distance_over_bound(self):
+        """Test distances over the bound are reported as bound + 1."""
+        assert _bounded_levenshtein("kitten", "sitting", 2) == 3
+        assert _bounded_levenshtein("a", "abcdef", 2) == 3
+        assert _bounded_levenshtein("arkane", "wilsontanner", 3) == 4
+
+
 class TestRecommendation:
     """Test the Recommendation dataclass."""
 
@@ -295,3 +521,10 @@ class TestSearchResult:
             id=123, artist="Artist", title="Title", date="2023-01-01", tracks=5, found=False
         )
         assert result.found is False
+
+    def test_search_result_immutable(self):
+        """Test that SearchResult is frozen/immutable."""
+        result = SearchResult(id=123, artist="Artist", title="Title", date="2023-01-01", tracks=5)
+
+        with pytest.raises((AttributeError, TypeError)):
+            result.found = False  # type: ignore
@@ -0,0 +1,90 @@
+"""Tests for BluesoundBaseClient XML record parsing."""
+
+import pytest
+import xmltodict
+
+from blue_cli.base_client import BluesoundBaseClient
+
+FIELDS = {"id": "albumid", "title": "title", "artist": "art"}
+
+
+@pytest.fixture
+def client():
+    """Provide a client pointing at an unused host."""
+    return BluesoundBaseClient("example.com", 11000)
+
+
+def test_parse_records_reads_attributes_and_children(client):
+    """Fields can come from attributes or child elements."""
+    xml = (
+        '<albums nextlink="/Albums?start=2">'
+        '<album albumid="1"><title>First</title><art>Artist</art></album>'
+        '<album albumid="2" title="Second"><art>Artist</art></album>'
+        "</albums>"
+    )
+
+    records, nextlink = client._parse_records(xml, "albums", "album", FIELDS)
+
+    assert records == [
+        {"id": "1", "title": "First", "artist": "Artist"},
+        {"id": "2", "title": "Second", "artist": "Artist"},
+    ]
+    assert nextlink == "/Albums?start=2"
+
+
+def test_parse_records_single_record_and_text(client):
+    """A single record is still a list, and "#text" reads the element text."""
+    xml = '<artists><art artistid="7">Low</art></artists>'
+
+    records, nextlink = client._parse_records(
+        xml, "artists", "art", {"id": "artistid", "name": "#text"}
+    )
+
+    assert records == [{"id": "7", "name": "Low"}]
+    assert nextlink is None
+
+
+def test_parse_records_matches_xmltodict_text(client):
+    """Indented text is stripped and empty elements are None, as xmltodict reads them."""
+    xml = """
+<albums>
+  <album albumid="1">
+    <title>
+      First
+    </title>
+    <art></art>
+  </album>
+  <album albumid="2" title=" Second ">
+    <art/>
+  </album>
+</albums>
+"""
+
+    records, nextlink = client._parse_records(xml, "albums", "album", FIELDS)
+
+    assert records == [
+        {"id": "1", "title": "First", "artist": None},
+        {"id": "2", "title": " Second ", "artist": None},
+    ]
+    assert records == [
+        {key: album.get(name) for key, name in FIELDS.items()}
+        for album in xmltodict.parse(xml, attr_prefix="", dict_constructor=dict)["albums"]["album"]
+    ]
+    assert nextlink is None
+
+
+def test_parse_records_indented_text_field(client):
+    """The "#text" field is stripped and an artist without text is None."""
+    xml = '<artists>\n  <art artistid="7">\n    Low\n  </art>\n  <art artistid="8"/>\n</artists>'
+
+    records, _ = client._parse_records(xml, "artists", "art", {"id": "artistid", "name": "#text"})
+
+    assert records == [{"id": "7", "name": "Low"}, {"id": "8", "name": None}]
+
+
+def test_parse_records_error_response(client):
+    """An error root element yields no records."""
+    records, nextlink = client._parse_records("<error>Not found</error>", "albums", "album", FIELDS)
+
+    assert records == []
+    assert nextlink is None
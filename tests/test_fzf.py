@@ -0,0 +1,41 @@
+"""Tests for streaming candidates into fzf."""
+
+import os
+
+import pytest
+
+from blue_cli.fzf import fzf_select
+
+
+@pytest.fixture
+def fake_fzf(tmp_path, monkeypatch):
+    """Put an fzf stand-in running `script` first on PATH."""
+
+    def install(script: str) -> None:
+        fzf = tmp_path / "fzf"
+        fzf.write_text(f"#!/bin/sh\n{script}\n")
+        fzf.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{tmp_path}:{os.environ['PATH']}")
+
+    return install
+
+
+def test_fzf_select_returns_selected_line(fake_fzf):
+    """The line fzf prints is returned without its newline."""
+    fake_fzf("sed -n 2p")
+
+    assert fzf_select((f"{i}\tline {i}" for i in range(3)), []) == "1\tline 1"
+
+
+def test_fzf_select_no_selection(fake_fzf):
+    """An aborted fzf yields None."""
+    fake_fzf("cat > /dev/null; exit 130")
+
+    assert fzf_select(["a", "b"], []) is None
+
+
+def test_fzf_select_early_exit(fake_fzf):
+    """fzf exiting before reading all input is not an error."""
+    fake_fzf("head -n 1")
+
+    assert fzf_select((str(i) for i in range(200_000)), []) == "0"
@@ -0,0 +1,115 @@
+"""Tests for the stat-keyed JSON cache loader and atomic writer."""
+
+import json
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+import pytest
+
+from blue_cli.json_cache import dump_json, load_json, load_json_derived
+
+
+def test_load_json_reuses_parsed_object(tmp_path):
+    """An unchanged file is parsed once and shared."""
+    path = tmp_path / "artists.json"
+    path.write_text(json.dumps([{"id": "1", "name": "Low"}]))
+
+    assert load_json(path) is load_json(path)
+
+
+def test_load_json_rereads_after_mtime_change(tmp_path):
+    """A rewritten file is parsed again."""
+    path = tmp_path / "albums.json"
+    path.write_text(json.dumps([1]))
+    os.utime(path, (1_000_000, 1_000_000))
+    assert load_json(path) == [1]
+
+    path.write_text(json.dumps([2]))
+    os.utime(path, (2_000_000, 2_000_000))
+    assert load_json(path) == [2]
+
+
+def test_load_json_rereads_rewrite_within_same_mtime(tmp_path):
+    """A file replaced by dump_json is parsed again even if its mtime is unchanged."""
+    path = tmp_path / "albums.json"
+    dump_json(path, [1])
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    assert load_json(path) == [1]
+
+    dump_json(path, [2])
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    assert load_json(path) == [2]
+
+
+def test_load_json_derived_builds_once_per_version(tmp_path):
+    """A derived index is built once and again only after the file is rewritten."""
+    path = tmp_path / "artists.json"
+    dump_json(path, [1, 2])
+    derive = Mock(side_effect=len)
+
+    assert load_json_derived(path, derive) == 2
+    assert load_json_derived(path, derive) == 2
+    assert derive.call_count == 1
+
+    dump_json(path, [1, 2, 3])
+    assert load_json_derived(path, derive) == 3
+    assert derive.call_count == 2
+
+
+def test_dump_json_replaces_file(tmp_path):
+    """The target is replaced whole and no temporary file is left behind."""
+    path = tmp_path / "songs.json"
+    path.write_text("stale")
+
+    dump_json(path, {"b": 1, "a": 2}, sort_keys=True)
+
+    assert path.read_text() == '{"a": 2, "b": 1}'
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_dump_json_concurrent_writers(tmp_path):
+    """Concurrent writers never trip over each other's temporary file."""
+    path = tmp_path / "albums.json"
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda i: dump_json(path, [i] * 1000), range(200)))
+
+    data = json.loads(path.read_text())
+    assert data == [data[0]] * 1000
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_dump_json_failed_write_cleans_up(tmp_path):
+    """A failed write keeps the old file and leaves no temporary file behind."""
+    path = tmp_path / "albums.json"
+    path.write_text("[1]")
+
+    with pytest.raises(TypeError):
+        dump_json(path, {"not serializable": object()})
+
+    assert path.read_text() == "[1]"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_dump_json_keeps_existing_mode(tmp_path):
+    """Rewriting a file keeps its permissions."""
+    path = tmp_path / "albums.json"
+    path.write_text("[1]")
+    path.chmod(0o644)
+
+    dump_json(path, [2])
+
+    assert stat.S_IMODE(path.stat().st_mode) == 0o644
+
+
+def test_dump_json_new_file_follows_umask(tmp_path):
+    """A new file gets the permissions open() would give it."""
+    path = tmp_path / "albums.json"
+    expected = tmp_path / "expected.json"
+    expected.write_text("[]")
+
+    dump_json(path, [])
+
+    assert stat.S_IMODE(path.stat().st_mode) == stat.S_IMODE(expected.stat().st_mode)
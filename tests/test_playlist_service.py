@@ -0,0 +1,82 @@
+"""Tests for PlaylistInfo queue helpers and playlist parsing."""
+
+from blue_cli.base_client import BluesoundBaseClient
+from blue_cli.playlist_service import PlaylistInfo, PlaylistService, PlaylistSong
+
+
+def make_playlist() -> PlaylistInfo:
+    """Queue with album 10 split into two blocks around album 20."""
+    return PlaylistInfo(
+        songs=[
+            PlaylistSong(0, "Low", "Things We Lost", "Monkey", 10),
+            PlaylistSong(1, "Low", "Things We Lost", "Sunflower", 10),
+            PlaylistSong(2, "Slowdive", "Souvlaki", "Alison", 20),
+            PlaylistSong(3, "Low", "Things We Lost", "Laser Beam", 10),
+        ]
+    )
+
+
+def test_get_songs_by_album_id():
+    """Songs are returned in queue order and unknown albums are empty."""
+    playlist = make_playlist()
+
+    assert [song.id for song in playlist.get_songs_by_album_id(10)] == [0, 1, 3]
+    assert playlist.get_songs_by_album_id(99) == []
+
+
+def test_get_songs_by_album_id_returns_copy():
+    """Callers cannot mutate the cached album index."""
+    playlist = make_playlist()
+
+    playlist.get_songs_by_album_id(20).clear()
+
+    assert len(playlist.get_songs_by_album_id(20)) == 1
+
+
+def test_get_contiguous_album_blocks():
+    """Each contiguous run of an album is its own block."""
+    playlist = make_playlist()
+
+    assert playlist.get_contiguous_album_blocks() == [
+        ("Low", "Things We Lost", 2, 10, 1),
+        ("Slowdive", "Souvlaki", 1, 20, 2),
+        ("Low", "Things We Lost", 1, 10, 3),
+    ]
+
+
+def test_get_contiguous_album_blocks_splits_unknown_album_ids():
+    """Songs without an album id (0) are still split by album name."""
+    playlist = PlaylistInfo(
+        songs=[
+            PlaylistSong(0, "A", "One", "x", 0),
+            PlaylistSong(1, "B", "Two", "y", 0),
+        ]
+    )
+
+    assert [block[1] for block in playlist.get_contiguous_album_blocks()] == ["One", "Two"]
+
+
+def test_parse_playlist_response():
+    """Playlist songs are read from attributes and child elements."""
+    service = PlaylistService(BluesoundBaseClient("example.com", 11000))
+    xml = (
+        '<playlist name="Queue" length="2">'
+        '<song id="0" albumid="10"><title>Monkey</title><art>Low</art>'
+        "<alb>Things We Lost</alb></song>"
+        '<song id="1"><title>Alison</title><art>Slowdive</art></song>'
+        "</playlist>"
+    )
+
+    songs = service._parse_playlist_response(xml).songs
+
+    assert songs == [
+        PlaylistSong(0, "Low", "Things We Lost", "Monkey", 10),
+        PlaylistSong(1, "Slowdive", "", "Alison", 0),
+    ]
+
+
+def test_parse_playlist_response_empty_queue():
+    """An empty queue has no songs."""
+    service = PlaylistService(BluesoundBaseClient("example.com", 11000))
+
+    assert service._parse_playlist_response('<playlist length="0"/>').songs == []
@@ -0,0 +1,179 @@
+"""Tests for TidalService caching, album lookups and favorite artist album selection."""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+from click import ClickException
+from diskcache import Cache
+
+from blue_cli.tidal_service import TidalService, two_level_cache
+
+ARTISTS = [{"id": str(i), "name": f"Artist {i}"} for i in range(10)]
+
+
+@pytest.fixture
+def disk_cache(tmp_path, monkeypatch):
+    """A throwaway diskcache store for functions decorated inside the test."""
+    disk = Cache(tmp_path)
+    monkeypatch.setattr("blue_cli.tidal_service.cache", disk)
+    yield disk
+    disk.close()
+
+
+def test_two_level_cache_skips_disk_cache_on_repeat(disk_cache, monkeypatch):
+    """A repeated call is answered from process memory without reading diskcache."""
+    fetch = Mock(return_value=[{"id": "1"}])
+
+    @two_level_cache(expire=60)
+    def records(key):
+        return fetch(key)
+
+    assert records("a") == [{"id": "1"}]
+    disk_get = Mock(wraps=disk_cache.get)
+    monkeypatch.setattr(disk_cache, "get", disk_get)
+
+    assert records("a") == [{"id": "1"}]
+    fetch.assert_called_once_with("a")
+    disk_get.assert_not_called()
+
+
+def test_two_level_cache_results_are_copies(disk_cache):
+    """Changing a returned list or its records does not change later results."""
+
+    @two_level_cache(expire=60)
+    def records(key):
+        return [{"id": "1"}]
+
+    first = records("a")
+    first[0]["id"] = "changed"
+    first.append({"id": "2"})
+
+    assert records("a") == [{"id": "1"}]
+
+
+def latest_album(artist_id: str) -> list[dict]:
+    """One album per artist, its id matching the artist id."""
+    return [{"id": artist_id, "title": f"Album {artist_id}", "date": "2020-01-01"}]
+
+
+@pytest.fixture
+def tidal():
+    """TidalService over fixed favorites with its requests stubbed."""
+    service = TidalService("example.com", 11000)
+    service.search_artists = Mock(return_value=ARTISTS)  # type: ignore[method-assign]
+    service.get_albums = Mock(side_effect=latest_album)  # type: ignore[method-assign]
+    service.add_album_to_queue = Mock()  # type: ignore[method-assign]
+    return service
+
+
+def queued_ids(service: TidalService) -> list[str]:
+    """Album ids added to the queue, in call order."""
+    return [c.args[0] for c in service.add_album_to_queue.call_args_list]  # type: ignore[attr-defined]
+
+
+def test_add_latest_albums_fetches_only_needed_artists(tidal):
+    """No albums are fetched past the artists that fill the request."""
+    tidal.add_latest_albums_from_favorites(2)
+
+    assert queued_ids(tidal) == ["0", "1"]
+    assert tidal.get_albums.call_count == 2
+
+
+def test_add_latest_albums_skips_failed_artist(tidal, capsys):
+    """An artist whose albums cannot be fetched is skipped and the summary still prints."""
+
+    def get_albums(artist_id: str) -> list[dict]:
+        if artist_id == "1":
+            raise ClickException("Connection error")
+        return latest_album(artist_id)
+
+    tidal.get_albums.side_effect = get_albums
+
+    tidal.add_latest_albums_from_favorites(2)
+
+    assert queued_ids(tidal) == ["0", "2"]
+    out = capsys.readouterr().out
+    assert "Could not fetch albums for Artist 1." in out
+    assert "Added latest albums:" in out
+
+
+SEPARATOR = chr(31)
+CACHED_ALBUMS = [
+    {
+        "id": album_id,
+        "artist": artist,
+        "title": "Songs",
+        "date": "2001",
+        "tracks": "9",
+        "quality": "cd",
+    }
+    for album_id, artist in (("1", "Low"), ("2", "Slowdive"))
+]
+
+
+def album_line(artist: str, title: str = "Songs") -> str:
+    """Album display string as select_album shows it."""
+    return f"{artist}{SEPARATOR}: {title} {SEPARATOR}/ 2001 - 9 - cd"
+
+
+@pytest.fixture
+def cached_albums(tidal, tmp_path, monkeypatch):
+    """albums.json holding two releases that differ only by artist."""
+    (tmp_path / "albums.json").write_text(json.dumps(CACHED_ALBUMS))
+    monkeypatch.setattr("blue_cli.tidal_service.cache_path", tmp_path)
+    tidal.get_album_tracks_by_id = Mock(return_value=[])
+    return tidal
+
+
+def test_get_album_tracks_matches_artist(cached_albums):
+    """The artist picks between albums with the same release fields."""
+    cached_albums.get_album_tracks(album_line("Slowdive"))
+
+    cached_albums.get_album_tracks_by_id.assert_called_once_with("2")
+
+
+def test_get_album_tracks_without_artist(cached_albums):
+    """An empty artist matches on the release fields alone, first cached entry wins."""
+    cached_albums.get_album_tracks(album_line(""))
+
+    cached_albums.get_album_tracks_by_id.assert_called_once_with("1")
+
+
+def test_get_album_tracks_unknown_album(cached_albums):
+    """An album missing from albums.json is a KeyError."""
+    with pytest.raises(KeyError):
+        cached_albums.get_album_tracks(album_line("Low", "Other Songs"))
+
+
+def album_page(*album_ids: str, nextlink: str = "") -> SimpleNamespace:
+    """An Albums response page, with a nextlink when more pages follow."""
+    albums = "".join(
+        f'<album albumid="{album_id}" title="Album {album_id}"><art>Low</art></album>'
+        for album_id in album_ids
+    )
+    attrs = f' nextlink="{nextlink}"' if nextlink else ""
+    return SimpleNamespace(content=f"<albums{attrs}>{albums}</albums>".encode())
+
+
+def test_search_albums_keeps_albums_before_empty_page(tidal, tmp_path, monkeypatch):
+    """An empty page ends the search and the albums found so far are cached."""
+    monkeypatch.setattr("blue_cli.tidal_service.cache_path", tmp_path)
+    tidal._make_request = Mock(
+        side_effect=[album_page("1", nextlink="Albums?start=1"), album_page()]
+    )
+
+    albums = tidal.search_albums("Songs")
+
+    assert [album["id"] for album in albums] == ["1"]
+    assert json.loads((tmp_path / "albums.json").read_text()) == albums
+
+
+def test_search_albums_empty_result(tidal, tmp_path, monkeypatch):
+    """No albums is an empty list and leaves albums.json alone."""
+    monkeypatch.setattr("blue_cli.tidal_service.cache_path", tmp_path)
+    tidal._make_request = Mock(return_value=album_page())
+
+    assert tidal.search_albums("Nothing") == []
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,127 @@
+"""Tests for UsbService album enqueueing."""
+
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from blue_cli.usb_service import UsbService
+
+ALBUMS = [
+    {
+        "url": f"/Add?playnow=1&service=LocalMusic&album=Album+{i}",
+        "Artist": f"Artist {i}",
+        "Album": f"Album {i}",
+    }
+    for i in range(10)
+]
+
+
+def album_name(album: dict) -> str:
+    """Name the random enqueue cache stores for an album."""
+    return f"{album['Album']}: {album['Artist']}"
+
+
+@pytest.fixture
+def usb(tmp_path, monkeypatch):
+    """UsbService over a fixed library with its request and cache file stubbed."""
+    cache_file = tmp_path / "cache.json"
+    monkeypatch.setattr(
+        "blue_cli.usb_service.Cachefmanager.get_cache_file", lambda self: cache_file
+    )
+    service = UsbService("example.com", 11000)
+    service.all_albums = Mock(return_value=ALBUMS)  # type: ignore[method-assign]
+    service._make_request = Mock()  # type: ignore[method-assign]
+    return service
+
+
+def enqueued_albums(service: UsbService) -> list[str]:
+    """Album names behind the URLs sent to _make_request, in call order."""
+    by_url = {
+        album["url"].replace("playnow=1", "playnow=-1&where=last"): album_name(album)
+        for album in ALBUMS
+    }
+    return [by_url[c.args[0]] for c in service._make_request.call_args_list]  # type: ignore[attr-defined]
+
+
+def test_enqueue_random_albums_skips_cached(usb):
+    """Only albums missing from the cache are picked."""
+    cached = [album_name(album) for album in ALBUMS[:5]]
+    usb.cache_manager.cache_file.write_text(json.dumps(cached))
+
+    usb.enqueue_random_albums(3)
+
+    added = enqueued_albums(usb)
+    assert len(added) == 3
+    assert len(set(added)) == 3
+    assert not set(added) & set(cached)
+
+
+def test_enqueue_random_albums_fewer_remaining(usb):
+    """All remaining albums are enqueued when fewer are left than requested."""
+    cached = [album_name(album) for album in ALBUMS[:7]]
+    usb.cache_manager.cache_file.write_text(json.dumps(cached))
+
+    usb.enqueue_random_albums(5)
+
+    assert sorted(enqueued_albums(usb)) == sorted(album_name(album) for album in ALBUMS[7:])
+
+
+def test_enqueue_random_albums_bounds_saved_cache(usb):
+    """The saved cache keeps only the most recent picks, 65% of the library."""
+    usb.enqueue_random_albums(len(ALBUMS))
+
+    added = enqueued_albums(usb)
+    assert sorted(added) == sorted(album_name(album) for album in ALBUMS)
+    assert json.loads(usb.cache_manager.cache_file.read_text()) == added[-6:]
+
+
+def assert_enqueued_at_end(service: UsbService, expected: list[dict]) -> None:
+    """Each album was sent once, its playURL rewritten exactly once to append."""
+    sent = [c.args[0] for c in service._make_request.call_args_list]  # type: ignore[attr-defined]
+    assert sorted(sent) == sorted(
+        album["url"].replace("playnow=1", "playnow=-1&where=last") for album in expected
+    )
+    for url in sent:
+        assert url.count("playnow=") == 1
+        assert url.count("where=last") == 1
+
+
+def test_search_enqueues_at_end(usb, monkeypatch):
+    """Albums picked by artist are appended to the queue."""
+    fzf = Mock()
+    fzf.prompt.side_effect = [["Artist 1"], ["Album 1"], IndexError]
+    monkeypatch.setattr("blue_cli.usb_service.FZF", fzf)
+
+    with pytest.raises(SystemExit):
+        usb.search()
+
+    assert_enqueued_at_end(usb, [ALBUMS[1]])
+
+
+def test_search_albums_enqueues_at_end(usb, monkeypatch):
+    """Albums picked by title are appended to the queue."""
+    fzf = Mock()
+    fzf.prompt.side_effect = [["Album 2", "Album 3"], IndexError]
+    monkeypatch.setattr("blue_cli.usb_service.FZF", fzf)
+
+    with pytest.raises(SystemExit):
+        usb.search_albums()
+
+    assert_enqueued_at_end(usb, ALBUMS[2:4])
+
+
+def test_enqueue_random_albums_enqueues_at_end(usb):
+    """Random albums are appended to the queue."""
+    usb.enqueue_random_albums(len(ALBUMS))
+
+    assert_enqueued_at_end(usb, ALBUMS)
+
+
+def test_add_list_to_queue_enqueues_at_end(usb):
+    """Albums listed on stdin are appended to the queue."""
+    usb.list_from_stdin = lambda: ["Artist 4 - Album 4", "Artist 5 - Album 5"]
+
+    usb.add_list_to_queue()
+
+    assert_enqueued_at_end(usb, ALBUMS[4:6])